@@ -1,38 +1,412 @@
-from flask import Flask, render_template, jsonify, request
-import json
+from flask import Flask, Response, request
+import concurrent.futures
+import hashlib
+import math
 import os
-from dotenv import load_dotenv
-import google.generativeai as genai
-
-# Load environment variables
-load_dotenv()
+import queue
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Annotated, Literal, Optional
+import numpy as np
+import orjson
+from numba import njit
+from pydantic import BaseModel, BeforeValidator, Field, ValidationError
+
+# Load environment variables (containers get them injected, so there may be no .env)
+if os.path.exists('.env'):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 app = Flask(__name__)
 
-# Configure Gemini API if key is available
+# Gemini is configured on first use so routes that never call it don't pay
+# for importing the SDK
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-2.5-pro')
-else:
-    model = None
+GEMINI_MODEL_NAME = 'gemini-2.5-pro'
+model = None
+model_lock = threading.Lock()
+
+def get_model():
+    """Return the Gemini model, creating it on first call; None without an API key"""
+    global model
+    if model is None and GEMINI_API_KEY:
+        with model_lock:
+            if model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=GEMINI_API_KEY)
+                model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+    return model
+
+# Upper bound (seconds) on a single Gemini call before the request is failed
+GEMINI_TIMEOUT_SECONDS = 30
+
+def gemini_request_options():
+    """Request options that cap a Gemini call, retries included, at GEMINI_TIMEOUT_SECONDS"""
+    # The SDK is already imported once a model exists
+    from google.api_core.retry import Retry
+    return {'timeout': GEMINI_TIMEOUT_SECONDS, 'retry': Retry(timeout=GEMINI_TIMEOUT_SECONDS)}
+
+def gemini_timed_out(error):
+    """True if a Gemini call (or the wait for a shared one) ran out of time"""
+    from google.api_core.exceptions import DeadlineExceeded, RetryError
+    return isinstance(error, (TimeoutError, DeadlineExceeded, RetryError))
+
+# Exact-match cache of Gemini answers, keyed by a hash of (model, prompt).
+# Entries expire so answers pick up model updates behind the model alias.
+GEMINI_CACHE_SIZE = 4096
+GEMINI_CACHE_TTL_SECONDS = int(os.getenv('GEMINI_CACHE_TTL_SECONDS', 24 * 60 * 60))
+gemini_cache = OrderedDict()  # key -> (expires_at, text)
+
+# At most this many Gemini calls run at once across the threads of one worker
+# process; identical prompts already in flight share one call. The limit is
+# per process, so the service-wide cap is this times gunicorn's worker count
+# (see gunicorn_conf.py) and should be sized against the API quota with that in
+# mind. Requests run on gunicorn's worker threads, so these are threading
+# primitives.
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', 8))
+gemini_semaphore = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENCY)
+gemini_inflight = {}
+gemini_lock = threading.Lock()
+
+def gemini_cache_key(prompt):
+    """Build the cache key for a prompt sent to the configured model"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(model.model_name.encode())
+    h.update(b'\0')
+    h.update(prompt.encode())
+    return h.hexdigest()
+
+def gemini_cache_lookup(key):
+    """Return the cached answer for a key, or None on a miss"""
+    with gemini_lock:
+        entry = gemini_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if expires_at <= time.monotonic():
+            del gemini_cache[key]
+            return None
+        gemini_cache.move_to_end(key)
+        return text
+
+def gemini_claim(key):
+    """Join the in-flight call for a key, or start one; returns (future, is_leader)"""
+    with gemini_lock:
+        future = gemini_inflight.get(key)
+        if future is not None:
+            return future, False
+        future = concurrent.futures.Future()
+        gemini_inflight[key] = future
+        return future, True
+
+def gemini_resolve(key, future, text=None, error=None):
+    """Finish an in-flight call: cache a successful answer and wake any waiters"""
+    with gemini_lock:
+        if error is None:
+            gemini_cache[key] = (time.monotonic() + GEMINI_CACHE_TTL_SECONDS, text)
+            if len(gemini_cache) > GEMINI_CACHE_SIZE:
+                gemini_cache.popitem(last=False)
+        gemini_inflight.pop(key, None)
+
+    if error is None:
+        future.set_result(text)
+    else:
+        future.set_exception(error)
+
+def acquire_gemini_slot():
+    """Wait for a free Gemini slot, raising TimeoutError if none frees up in time"""
+    if not gemini_semaphore.acquire(timeout=GEMINI_TIMEOUT_SECONDS):
+        raise TimeoutError('All Gemini slots are busy')
+
+def cached_generate(prompt):
+    """Return Gemini's text answer for a prompt, reusing cached answers"""
+    key = gemini_cache_key(prompt)
+    text = gemini_cache_lookup(key)
+    if text is not None:
+        return text
+
+    future, is_leader = gemini_claim(key)
+    if not is_leader:
+        return future.result(timeout=GEMINI_TIMEOUT_SECONDS)
+
+    try:
+        acquire_gemini_slot()
+        try:
+            response = model.generate_content(
+                prompt,
+                request_options=gemini_request_options()
+            )
+        finally:
+            gemini_semaphore.release()
+        text = response.text
+    except Exception as e:
+        gemini_resolve(key, future, error=e)
+        raise
+
+    gemini_resolve(key, future, text=text)
+    return text
+
+def sse_event(payload):
+    """Encode a payload as one Server-Sent Events message"""
+    return f"data: {orjson.dumps(payload).decode()}\n\n"
+
+def sse_error(error):
+    """Encode a failed analysis as an SSE message"""
+    if gemini_timed_out(error):
+        return sse_event({'error': 'Gemini analysis timed out'})
+    return sse_event({'error': f'Failed to generate analysis: {str(error)}'})
+
+def run_gemini_stream(key, future, prompt, chunks):
+    """Read a streaming Gemini call into a queue, ending with None or the error.
+
+    Runs on its own thread so the Gemini slot is held only for as long as
+    Gemini takes, not for as long as the client takes to read the answer.
+    """
+    parts = []
+    try:
+        acquire_gemini_slot()
+        try:
+            for chunk in model.generate_content(
+                prompt,
+                stream=True,
+                request_options=gemini_request_options()
+            ):
+                parts.append(chunk.text)
+                chunks.put(chunk.text)
+        finally:
+            gemini_semaphore.release()
+    except Exception as e:
+        gemini_resolve(key, future, error=e)
+        chunks.put(e)
+    else:
+        gemini_resolve(key, future, text=''.join(parts))
+        chunks.put(None)
+
+def stream_generate(prompt):
+    """Yield Gemini's answer as SSE deltas; a cached or shared answer is sent as one event"""
+    key = gemini_cache_key(prompt)
+    text = gemini_cache_lookup(key)
+    if text is None:
+        future, is_leader = gemini_claim(key)
+        if not is_leader:
+            try:
+                text = future.result(timeout=GEMINI_TIMEOUT_SECONDS)
+            except Exception as e:
+                yield sse_error(e)
+                return
+
+    if text is not None:
+        yield sse_event({'delta': text})
+        return
+
+    chunks = queue.SimpleQueue()
+    threading.Thread(
+        target=run_gemini_stream,
+        args=(key, future, prompt, chunks),
+        daemon=True
+    ).start()
+
+    while True:
+        item = chunks.get()
+        if item is None:
+            return
+        if isinstance(item, Exception):
+            yield sse_error(item)
+            return
+        yield sse_event({'delta': item})
 
 # Load data
 def load_machine_data():
-    with open('data/machines.json', 'r') as f:
-        return json.load(f)
+    with open('data/machines.json', 'rb') as f:
+        return orjson.loads(f.read())
 
 def load_disk_data():
-    with open('data/disks.json', 'r') as f:
-        return json.load(f)
+    with open('data/disks.json', 'rb') as f:
+        return orjson.loads(f.read())
 
 machine_data = load_machine_data()
 disk_data = load_disk_data()
 
+# Flat lookup indexes over machine_data
+def build_machine_index():
+    """Map machine_type -> (family, machine), first family wins on duplicates"""
+    index = {}
+    for family, family_data in machine_data.items():
+        for machine_type, machine in family_data['machines'].items():
+            index.setdefault(machine_type, (family, machine))
+    return index
+
+MACHINE_INDEX = build_machine_index()
+
+# Disk performance models, resolved once per disk type instead of by name prefix
+DISK_SCALED = 0      # Standard, Balanced, SSD, Extreme - scale with size
+DISK_LOCAL_SSD = 1   # Fixed performance per device
+DISK_HYPERDISK = 2   # Provisioned performance ranges
+
+def disk_kind(disk_type):
+    """Classify a disk type by how its performance is determined"""
+    if disk_type == 'local-ssd':
+        return DISK_LOCAL_SSD
+    if disk_type.startswith('hyperdisk'):
+        return DISK_HYPERDISK
+    return DISK_SCALED
+
+DISK_KIND = {disk_type: disk_kind(disk_type) for disk_type in disk_data}
+
+def build_disk_scaling(spec):
+    """Flatten a size-scaled disk spec into a tuple of its per-GB rates and caps.
+
+    Order: baseline IOPS r/w, IOPS per GB r/w, max IOPS r/w,
+    throughput per GB r/w, max throughput r/w. Baseline is 0 when absent.
+    """
+    baseline = spec.get('iops_baseline', {})
+    return (
+        baseline.get('read', 0), baseline.get('write', 0),
+        spec['iops_per_gb']['read'], spec['iops_per_gb']['write'],
+        spec['iops_max']['read'], spec['iops_max']['write'],
+        spec['throughput_per_gb']['read'], spec['throughput_per_gb']['write'],
+        spec['throughput_max']['read'], spec['throughput_max']['write']
+    )
+
+DISK_SCALING = {
+    disk_type: build_disk_scaling(disk_data[disk_type])
+    for disk_type, kind in DISK_KIND.items()
+    if kind == DISK_SCALED
+}
+
+# Limits used when a machine has no entry for the requested disk type
+MACHINE_DEFAULT_LIMITS = {
+    machine_type: next(iter(machine['disk_limits'].values()))
+    for machine_type, (family, machine) in MACHINE_INDEX.items()
+    if machine.get('disk_limits')
+}
+
+# Precomputed responses (the data files are read-only after startup)
+def build_all_machines():
+    """Build the flat, sorted machine list served by /api/all-machines"""
+    all_machines = []
+    for family, family_data in machine_data.items():
+        for machine_type, specs in family_data['machines'].items():
+            all_machines.append({
+                'machine_type': machine_type,
+                'family': family,
+                'family_description': family_data['description'],
+                'vcpu': specs['vcpu'],
+                'memory_gb': specs['memory_gb'],
+                'display_name': f"{machine_type} ({family})"
+            })
+
+    # Sort by machine type name
+    all_machines.sort(key=lambda x: x['machine_type'])
+    return all_machines
+
+def build_disk_types():
+    """Build the disk type list served by /api/disk-types"""
+    disk_types = []
+    for disk_type, specs in disk_data.items():
+        disk_types.append({
+            'disk_type': disk_type,
+            'name': specs['name'],
+            'type': specs['type'],
+            'description': specs['description'],
+            'min_size_gb': specs.get('min_size_gb', 10),
+            'max_size_gb': specs.get('max_size_gb', 65536)
+        })
+    return disk_types
+
+def content_etag(body):
+    """Strong ETag for a precomputed response body"""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+ALL_MACHINES_JSON = orjson.dumps(build_all_machines())
+ALL_MACHINES_ETAG = content_etag(ALL_MACHINES_JSON)
+DISK_TYPES_JSON = orjson.dumps(build_disk_types())
+DISK_TYPES_ETAG = content_etag(DISK_TYPES_JSON)
+
+# The page has no per-request variables, so render it once; url_for needs a
+# request context to build the static asset URLs
+with app.test_request_context('/'):
+    INDEX_HTML = app.jinja_env.get_template('index.html').render().encode()
+INDEX_ETAG = content_etag(INDEX_HTML)
+INDEX_CACHE_CONTROL = 'public, max-age=300'
+
+def fast_jsonify(obj):
+    """jsonify replacement that encodes with orjson"""
+    return Response(orjson.dumps(obj), mimetype='application/json')
+
+def static_json_response(body, etag):
+    """Serve precomputed JSON, answering 304 when the client's ETag matches"""
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+# Endpoints whose responses only change when the data files change (i.e. on deploy)
+STATIC_ROUTES = {'get_all_machines', 'get_disk_types'}
+STATIC_CACHE_CONTROL = 'public, max-age=3600, stale-while-revalidate=86400, immutable'
+
+@app.after_request
+def add_static_cache_headers(response):
+    """Let browsers and CDNs cache the static endpoints"""
+    if request.endpoint in STATIC_ROUTES and response.status_code in (200, 304):
+        response.headers['Cache-Control'] = STATIC_CACHE_CONTROL
+    return response
+
+def build_bottleneck_labels():
+    """Bottleneck text for every bottleneck code.
+
+    code = iops_read + 2 * iops_write + 4 * throughput_read + 12 * throughput_write,
+    where the IOPS terms are 0/1 and the throughput terms are 0 (none), 1 (disk)
+    or 2 (network).
+    """
+    labels = []
+    for code in range(36):
+        bottlenecks = []
+        if code & 1:
+            bottlenecks.append('disk IOPS (read)')
+        if code >> 1 & 1:
+            bottlenecks.append('disk IOPS (write)')
+        throughput_read, throughput_write = code // 4 % 3, code // 12
+        if throughput_read:
+            bottlenecks.append('disk throughput (read)' if throughput_read == 1 else 'network bandwidth (read)')
+        if throughput_write:
+            bottlenecks.append('disk throughput (write)' if throughput_write == 1 else 'network bandwidth (write)')
+
+        if bottlenecks:
+            labels.append('Bottleneck: ' + ', '.join(bottlenecks))
+        else:
+            labels.append('Machine type is the limiting factor')
+    return tuple(labels)
+
+BOTTLENECK_LABELS = build_bottleneck_labels()
+
+def bottleneck_label(machine_specs, effective_iops_read, effective_iops_write,
+                     effective_throughput_read, effective_throughput_write,
+                     disk_throughput_read, disk_throughput_write, network_throughput_mbps):
+    """Describe what limits performance below the machine's disk limits"""
+    # Check IOPS bottlenecks
+    code = 0
+    if effective_iops_read < machine_specs['max_disk_iops_read']:
+        code += 1
+    if effective_iops_write < machine_specs['max_disk_iops_write']:
+        code += 2
+
+    # Check throughput bottlenecks (disk vs network vs machine)
+    if effective_throughput_read < machine_specs['max_disk_throughput_read_mbps']:
+        code += 4 if disk_throughput_read <= network_throughput_mbps else 8
+    if effective_throughput_write < machine_specs['max_disk_throughput_write_mbps']:
+        code += 12 if disk_throughput_write <= network_throughput_mbps else 24
+
+    return BOTTLENECK_LABELS[code]
+
 # Calculator functions
+# Results are memoized and shared between requests, so callers must not mutate them
+@lru_cache(maxsize=4096)
 def calculate_disk_performance(disk_type, disk_size_gb):
     """Calculate disk IOPS and throughput based on type and size"""
-    if disk_type not in disk_data:
+    kind = DISK_KIND.get(disk_type)
+    if kind is None:
         return None
 
     disk_spec = disk_data[disk_type]
@@ -43,7 +417,7 @@ def calculate_disk_performance(disk_type, disk_size_gb):
     }
 
     # Handle different disk types
-    if disk_type == 'local-ssd':
+    if kind == DISK_LOCAL_SSD:
         # Local SSD has fixed performance per device
         num_devices = max(1, disk_size_gb / 375)
         result['iops_read'] = int(disk_spec['iops_fixed']['read'] * num_devices)
@@ -51,7 +425,7 @@ def calculate_disk_performance(disk_type, disk_size_gb):
         result['throughput_read_mbps'] = int(disk_spec['throughput_fixed']['read'] * num_devices)
         result['throughput_write_mbps'] = int(disk_spec['throughput_fixed']['write'] * num_devices)
 
-    elif disk_type.startswith('hyperdisk'):
+    elif kind == DISK_HYPERDISK:
         # Hyperdisk has provisioned performance ranges
         result['iops_min'] = disk_spec.get('iops_min', disk_spec.get('iops_fixed', 0))
         result['iops_max'] = disk_spec.get('iops_max', disk_spec.get('iops_fixed', 0))
@@ -62,25 +436,16 @@ def calculate_disk_performance(disk_type, disk_size_gb):
     else:
         # Standard, Balanced, SSD, Extreme - scale with size
         # Include baseline IOPS if available
-        baseline_read = disk_spec.get('iops_baseline', {}).get('read', 0)
-        baseline_write = disk_spec.get('iops_baseline', {}).get('write', 0)
-
-        iops_read = int(min(
-            baseline_read + disk_size_gb * disk_spec['iops_per_gb']['read'],
-            disk_spec['iops_max']['read']
-        ))
-        iops_write = int(min(
-            baseline_write + disk_size_gb * disk_spec['iops_per_gb']['write'],
-            disk_spec['iops_max']['write']
-        ))
-        throughput_read = int(min(
-            disk_size_gb * disk_spec['throughput_per_gb']['read'],
-            disk_spec['throughput_max']['read']
-        ))
-        throughput_write = int(min(
-            disk_size_gb * disk_spec['throughput_per_gb']['write'],
-            disk_spec['throughput_max']['write']
-        ))
+        (baseline_read, baseline_write,
+         iops_per_gb_read, iops_per_gb_write,
+         iops_max_read, iops_max_write,
+         throughput_per_gb_read, throughput_per_gb_write,
+         throughput_max_read, throughput_max_write) = DISK_SCALING[disk_type]
+
+        iops_read = int(min(baseline_read + disk_size_gb * iops_per_gb_read, iops_max_read))
+        iops_write = int(min(baseline_write + disk_size_gb * iops_per_gb_write, iops_max_write))
+        throughput_read = int(min(disk_size_gb * throughput_per_gb_read, throughput_max_read))
+        throughput_write = int(min(disk_size_gb * throughput_per_gb_write, throughput_max_write))
 
         result['iops_read'] = iops_read
         result['iops_write'] = iops_write
@@ -89,48 +454,90 @@ def calculate_disk_performance(disk_type, disk_size_gb):
 
     return result
 
+# Batch disk performance for size sweeps
+# Same layout as DISK_SCALING, as arrays for disk_perf_batch
+DISK_SPEC_ARRAYS = {
+    disk_type: np.array(scaling, dtype=np.float64)
+    for disk_type, scaling in DISK_SCALING.items()
+}
+
+@njit(cache=True)
+def disk_perf_batch(sizes, spec):
+    """Read/write IOPS and throughput for each size, same formula as calculate_disk_performance"""
+    n = sizes.shape[0]
+    iops_read = np.empty(n, dtype=np.int64)
+    iops_write = np.empty(n, dtype=np.int64)
+    throughput_read = np.empty(n, dtype=np.int64)
+    throughput_write = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        size = sizes[i]
+        iops_read[i] = int(min(spec[0] + size * spec[2], spec[4]))
+        iops_write[i] = int(min(spec[1] + size * spec[3], spec[5]))
+        throughput_read[i] = int(min(size * spec[6], spec[8]))
+        throughput_write[i] = int(min(size * spec[7], spec[9]))
+    return iops_read, iops_write, throughput_read, throughput_write
+
+def calculate_disk_performance_sweep(disk_type, sizes):
+    """Calculate disk performance for many sizes of one disk type"""
+    if disk_type not in DISK_SPEC_ARRAYS:
+        # Fixed or provisioned performance, nothing to vectorize
+        return [calculate_disk_performance(disk_type, size) for size in sizes]
+
+    disk_name = disk_data[disk_type]['name']
+    iops_read, iops_write, throughput_read, throughput_write = disk_perf_batch(
+        np.asarray(sizes, dtype=np.float64), DISK_SPEC_ARRAYS[disk_type]
+    )
+    return [
+        {
+            'disk_type': disk_type,
+            'disk_name': disk_name,
+            'disk_size_gb': size,
+            'iops_read': ir,
+            'iops_write': iw,
+            'throughput_read_mbps': tr,
+            'throughput_write_mbps': tw
+        }
+        for size, ir, iw, tr, tw in zip(
+            sizes, iops_read.tolist(), iops_write.tolist(),
+            throughput_read.tolist(), throughput_write.tolist()
+        )
+    ]
+
+@lru_cache(maxsize=4096)
 def find_machine_specs(machine_type, disk_type=None):
     """Find machine specs across all families, with disk-specific limits if provided"""
-    for family, family_data in machine_data.items():
-        if machine_type in family_data['machines']:
-            machine = family_data['machines'][machine_type]
-            result = {
-                'family': family,
-                'machine_type': machine_type,
-                'vcpu': machine['vcpu'],
-                'memory_gb': machine['memory_gb'],
-                'network_bandwidth_gbps': machine['network_bandwidth_gbps'],
-                'cpu_platform': machine.get('cpu_platform', 'Unknown')
-            }
-
-            # Get disk-specific limits
-            if disk_type and 'disk_limits' in machine:
-                if disk_type in machine['disk_limits']:
-                    limits = machine['disk_limits'][disk_type]
-                else:
-                    # Fallback to first available disk type
-                    limits = list(machine['disk_limits'].values())[0]
-
-                result['max_disk_iops_read'] = limits['max_disk_iops_read']
-                result['max_disk_iops_write'] = limits['max_disk_iops_write']
-                result['max_disk_throughput_read_mbps'] = limits['max_disk_throughput_read_mbps']
-                result['max_disk_throughput_write_mbps'] = limits['max_disk_throughput_write_mbps']
-            elif 'disk_limits' in machine:
-                # No disk type specified, use first available
-                limits = list(machine['disk_limits'].values())[0]
-                result['max_disk_iops_read'] = limits['max_disk_iops_read']
-                result['max_disk_iops_write'] = limits['max_disk_iops_write']
-                result['max_disk_throughput_read_mbps'] = limits['max_disk_throughput_read_mbps']
-                result['max_disk_throughput_write_mbps'] = limits['max_disk_throughput_write_mbps']
-            else:
-                # Old format without disk_limits (backward compatibility)
-                result['max_disk_iops_read'] = machine.get('max_disk_iops_read', 0)
-                result['max_disk_iops_write'] = machine.get('max_disk_iops_write', 0)
-                result['max_disk_throughput_read_mbps'] = machine.get('max_disk_throughput_read_mbps', 0)
-                result['max_disk_throughput_write_mbps'] = machine.get('max_disk_throughput_write_mbps', 0)
-
-            return result
-    return None
+    family, machine = MACHINE_INDEX.get(machine_type, (None, None))
+    if machine is None:
+        return None
+
+    result = {
+        'family': family,
+        'machine_type': machine_type,
+        'vcpu': machine['vcpu'],
+        'memory_gb': machine['memory_gb'],
+        'network_bandwidth_gbps': machine['network_bandwidth_gbps'],
+        'cpu_platform': machine.get('cpu_platform', 'Unknown')
+    }
+
+    # Get disk-specific limits
+    if 'disk_limits' in machine:
+        # Fallback to first available disk type
+        limits = machine['disk_limits'].get(disk_type) if disk_type else None
+        if limits is None:
+            limits = MACHINE_DEFAULT_LIMITS[machine_type]
+
+        result['max_disk_iops_read'] = limits['max_disk_iops_read']
+        result['max_disk_iops_write'] = limits['max_disk_iops_write']
+        result['max_disk_throughput_read_mbps'] = limits['max_disk_throughput_read_mbps']
+        result['max_disk_throughput_write_mbps'] = limits['max_disk_throughput_write_mbps']
+    else:
+        # Old format without disk_limits (backward compatibility)
+        result['max_disk_iops_read'] = machine.get('max_disk_iops_read', 0)
+        result['max_disk_iops_write'] = machine.get('max_disk_iops_write', 0)
+        result['max_disk_throughput_read_mbps'] = machine.get('max_disk_throughput_read_mbps', 0)
+        result['max_disk_throughput_write_mbps'] = machine.get('max_disk_throughput_write_mbps', 0)
+
+    return result
 
 def calculate_effective_performance(machine_specs, disk_performance):
     """Calculate effective performance considering machine, disk, and network limits"""
@@ -156,7 +563,7 @@ def calculate_effective_performance(machine_specs, disk_performance):
     }
 
     # Calculate effective performance (minimum of machine, disk, and network)
-    if disk_performance['disk_type'].startswith('hyperdisk'):
+    if DISK_KIND.get(disk_performance['disk_type']) == DISK_HYPERDISK:
         # Hyperdisk shows ranges
         result['effective_performance'] = {
             'note': 'Hyperdisk uses provisioned performance. Configure within the specified ranges.',
@@ -188,93 +595,20 @@ def calculate_effective_performance(machine_specs, disk_performance):
         }
 
         # Determine bottleneck
-        bottlenecks = []
-
-        # Check IOPS bottlenecks
-        if effective_iops_read < machine_specs['max_disk_iops_read']:
-            bottlenecks.append('disk IOPS (read)')
-        if effective_iops_write < machine_specs['max_disk_iops_write']:
-            bottlenecks.append('disk IOPS (write)')
-
-        # Check throughput bottlenecks (disk vs network vs machine)
-        if effective_throughput_read < machine_specs['max_disk_throughput_read_mbps']:
-            if disk_performance['throughput_read_mbps'] <= network_throughput_mbps:
-                bottlenecks.append('disk throughput (read)')
-            else:
-                bottlenecks.append('network bandwidth (read)')
-
-        if effective_throughput_write < machine_specs['max_disk_throughput_write_mbps']:
-            if disk_performance['throughput_write_mbps'] <= network_throughput_mbps:
-                bottlenecks.append('disk throughput (write)')
-            else:
-                bottlenecks.append('network bandwidth (write)')
-
-        if bottlenecks:
-            result['bottleneck'] = 'Bottleneck: ' + ', '.join(bottlenecks)
-        else:
-            result['bottleneck'] = 'Machine type is the limiting factor'
+        result['bottleneck'] = bottleneck_label(
+            machine_specs,
+            effective_iops_read, effective_iops_write,
+            effective_throughput_read, effective_throughput_write,
+            disk_performance['throughput_read_mbps'], disk_performance['throughput_write_mbps'],
+            network_throughput_mbps
+        )
 
     return result
 
-# API Routes
-@app.route('/')
-def index():
-    """Render the main page"""
-    return render_template('index.html')
-
-@app.route('/api/all-machines')
-def get_all_machines():
-    """Get all machine types in a flat list"""
-    all_machines = []
-    for family, family_data in machine_data.items():
-        for machine_type, specs in family_data['machines'].items():
-            all_machines.append({
-                'machine_type': machine_type,
-                'family': family,
-                'family_description': family_data['description'],
-                'vcpu': specs['vcpu'],
-                'memory_gb': specs['memory_gb'],
-                'display_name': f"{machine_type} ({family})"
-            })
-
-    # Sort by machine type name
-    all_machines.sort(key=lambda x: x['machine_type'])
-    return jsonify(all_machines)
-
-@app.route('/api/disk-types')
-def get_disk_types():
-    """Get all disk types with size constraints"""
-    disk_types = []
-    for disk_type, specs in disk_data.items():
-        disk_types.append({
-            'disk_type': disk_type,
-            'name': specs['name'],
-            'type': specs['type'],
-            'description': specs['description'],
-            'min_size_gb': specs.get('min_size_gb', 10),
-            'max_size_gb': specs.get('max_size_gb', 65536)
-        })
-    return jsonify(disk_types)
-
-@app.route('/api/optimal-disk-size', methods=['POST'])
-def get_optimal_disk_size():
+def compute_optimal_disk_size(machine_type, disk_type):
     """Calculate optimal disk size to match machine IOPS limits"""
-    data = request.get_json()
-
-    machine_type = data.get('machine_type')
-    disk_type = data.get('disk_type')
-
-    if not machine_type or not disk_type:
-        return jsonify({'error': 'Missing machine_type or disk_type'}), 400
-
-    # Get disk specs first to validate
-    if disk_type not in disk_data:
-        return jsonify({'error': 'Disk type not found'}), 404
-
     # Get machine specs with disk-specific limits
     machine_specs = find_machine_specs(machine_type, disk_type)
-    if not machine_specs:
-        return jsonify({'error': 'Machine type not found'}), 404
 
     disk_spec = disk_data[disk_type]
 
@@ -283,12 +617,12 @@ def get_optimal_disk_size():
     machine_max_throughput = machine_specs['max_disk_throughput_read_mbps']
 
     # Handle different disk types
-    if disk_type == 'local-ssd' or disk_type.startswith('hyperdisk'):
+    if DISK_KIND[disk_type] != DISK_SCALED:
         # These have fixed or provisioned performance
         optimal_size = 100
     else:
         # Standard, Balanced, SSD, Extreme - calculate based on formula
-        baseline = disk_spec.get('iops_baseline', {}).get('read', 0)
+        baseline = DISK_SCALING[disk_type][0]
         iops_per_gb = disk_spec['iops_per_gb']['read']
         disk_max_iops = disk_spec['iops_max']['read']
         throughput_per_gb = disk_spec['throughput_per_gb']['read']
@@ -323,27 +657,32 @@ def get_optimal_disk_size():
     # Calculate what IOPS this size would give
     disk_perf = calculate_disk_performance(disk_type, optimal_size)
 
-    return jsonify({
+    return {
         'optimal_size_gb': optimal_size,
         'machine_max_iops': machine_max_iops,
         'disk_iops_at_optimal': disk_perf.get('iops_read', 0) if disk_perf else 0
-    })
-
-@app.route('/api/calculate', methods=['POST'])
-def calculate():
-    """Calculate performance based on machine type and multiple disks"""
-    data = request.get_json()
+    }
 
-    machine_type = data.get('machine_type')
-    disks = data.get('disks', [])
+# The answer depends only on (machine_type, disk_type), so solve every pair once
+OPTIMAL_DISK_SIZE_JSON = {
+    (machine_type, disk_type): orjson.dumps(compute_optimal_disk_size(machine_type, disk_type))
+    for machine_type in MACHINE_INDEX
+    for disk_type in disk_data
+}
 
-    if not machine_type:
-        return jsonify({'error': 'Missing machine_type'}), 400
+@lru_cache(maxsize=4096)
+def calculate_configuration_json(machine_type, disks):
+    """Encoded /api/calculate result for a machine and a tuple of (disk_type, disk_size_gb).
 
-    if not disks or len(disks) == 0:
-        return jsonify({'error': 'At least one disk is required'}), 400
+    Returns None for an unknown machine type. Disk types and sizes must already be validated.
+    """
+    # Get machine specs (use first disk type for disk-specific limits)
+    first_disk_type = disks[0][0]
+    machine_specs = find_machine_specs(machine_type, first_disk_type)
+    if not machine_specs:
+        return None
 
-    # Validate and calculate performance for each disk
+    # Calculate performance for each disk
     individual_disks = []
     aggregate_performance = {
         'iops_read': 0,
@@ -352,46 +691,8 @@ def calculate():
         'throughput_write_mbps': 0
     }
 
-    for idx, disk in enumerate(disks):
-        disk_type = disk.get('disk_type')
-        disk_size_gb = disk.get('disk_size_gb')
-
-        if not disk_type or not disk_size_gb:
-            return jsonify({'error': f'Disk {idx + 1}: Missing disk_type or disk_size_gb'}), 400
-
-        try:
-            disk_size_gb = int(disk_size_gb)
-        except (ValueError, TypeError):
-            return jsonify({'error': f'Disk {idx + 1}: Size must be a valid number'}), 400
-
-        # Validate disk size is positive
-        if disk_size_gb <= 0:
-            return jsonify({'error': f'Disk {idx + 1}: Size must be greater than 0'}), 400
-
-        # Validate disk type exists and get constraints
-        if disk_type not in disk_data:
-            return jsonify({'error': f'Disk {idx + 1}: Unknown disk type: {disk_type}'}), 404
-
-        disk_spec = disk_data[disk_type]
-        min_size = disk_spec.get('min_size_gb', 10)
-        max_size = disk_spec.get('max_size_gb', 65536)
-
-        # Validate disk size against type-specific constraints
-        if disk_size_gb < min_size:
-            return jsonify({
-                'error': f'Disk {idx + 1}: Size too small for {disk_spec["name"]}. Minimum: {min_size} GB'
-            }), 400
-
-        if disk_size_gb > max_size:
-            return jsonify({
-                'error': f'Disk {idx + 1}: Size too large for {disk_spec["name"]}. Maximum: {max_size:,} GB'
-            }), 400
-
-        # Calculate disk performance
+    for disk_type, disk_size_gb in disks:
         disk_performance = calculate_disk_performance(disk_type, disk_size_gb)
-        if not disk_performance:
-            return jsonify({'error': f'Disk {idx + 1}: Failed to calculate performance'}), 500
-
         individual_disks.append(disk_performance)
 
         # Aggregate performance (sum across all disks)
@@ -401,12 +702,6 @@ def calculate():
             aggregate_performance['throughput_read_mbps'] += disk_performance['throughput_read_mbps']
             aggregate_performance['throughput_write_mbps'] += disk_performance['throughput_write_mbps']
 
-    # Get machine specs (use first disk type for disk-specific limits)
-    first_disk_type = disks[0].get('disk_type')
-    machine_specs = find_machine_specs(machine_type, first_disk_type)
-    if not machine_specs:
-        return jsonify({'error': f'Unknown machine type: {machine_type}'}), 404
-
     # Calculate effective performance comparing aggregate to machine limits
     network_throughput_mbps = machine_specs['network_bandwidth_gbps'] * 125
 
@@ -424,26 +719,13 @@ def calculate():
     )
 
     # Determine bottleneck
-    bottlenecks = []
-    if effective_iops_read < machine_specs['max_disk_iops_read']:
-        bottlenecks.append('disk IOPS (read)')
-    if effective_iops_write < machine_specs['max_disk_iops_write']:
-        bottlenecks.append('disk IOPS (write)')
-    if effective_throughput_read < machine_specs['max_disk_throughput_read_mbps']:
-        if aggregate_performance['throughput_read_mbps'] <= network_throughput_mbps:
-            bottlenecks.append('disk throughput (read)')
-        else:
-            bottlenecks.append('network bandwidth (read)')
-    if effective_throughput_write < machine_specs['max_disk_throughput_write_mbps']:
-        if aggregate_performance['throughput_write_mbps'] <= network_throughput_mbps:
-            bottlenecks.append('disk throughput (write)')
-        else:
-            bottlenecks.append('network bandwidth (write)')
-
-    if bottlenecks:
-        bottleneck = 'Bottleneck: ' + ', '.join(bottlenecks)
-    else:
-        bottleneck = 'Machine type is the limiting factor'
+    bottleneck = bottleneck_label(
+        machine_specs,
+        effective_iops_read, effective_iops_write,
+        effective_throughput_read, effective_throughput_write,
+        aggregate_performance['throughput_read_mbps'], aggregate_performance['throughput_write_mbps'],
+        network_throughput_mbps
+    )
 
     result = {
         'machine_type': machine_specs['machine_type'],
@@ -470,24 +752,428 @@ def calculate():
         'bottleneck': bottleneck
     }
 
-    return jsonify(result)
+    return orjson.dumps(result)
+
+# Vectorized effective performance for batches of (machine, size-scaled disk, size).
+# Configurations are addressed by integer IDs into structure-of-arrays tables.
+MACHINE_IDS = {machine_type: i for i, machine_type in enumerate(MACHINE_INDEX)}
+SCALED_DISK_IDS = {disk_type: j for j, disk_type in enumerate(DISK_SPEC_ARRAYS)}
+DISK_SPEC_TABLE = np.array(list(DISK_SPEC_ARRAYS.values()), dtype=np.float64).reshape(-1, 10)
+
+def build_machine_limits_table():
+    """Per (machine, disk) row: iops read/write, throughput read/write, network MB/s"""
+    table = np.zeros((len(MACHINE_IDS), len(SCALED_DISK_IDS), 5), dtype=np.float64)
+    for machine_type, i in MACHINE_IDS.items():
+        for disk_type, j in SCALED_DISK_IDS.items():
+            specs = find_machine_specs(machine_type, disk_type)
+            table[i, j] = (
+                specs['max_disk_iops_read'],
+                specs['max_disk_iops_write'],
+                specs['max_disk_throughput_read_mbps'],
+                specs['max_disk_throughput_write_mbps'],
+                specs['network_bandwidth_gbps'] * 125
+            )
+    return table
+
+MACHINE_LIMITS_TABLE = build_machine_limits_table()
+
+# Network MB/s is Gbps * 125; integral for all current machines, so throughput stays integer
+THROUGHPUT_DTYPE = np.int64 if np.all(MACHINE_LIMITS_TABLE[..., 4] % 1 == 0) else np.float64
+
+BOTTLENECK_LABEL_ARRAY = np.array(BOTTLENECK_LABELS, dtype=object)
+
+@njit(cache=True)
+def effective_perf_kernel(sizes, machine_ids, disk_ids, disk_specs, machine_limits,
+                          disk_out, effective_out, codes):
+    """Fused per-row loop behind calculate_effective_performance_batch.
+
+    Writes disk IOPS/throughput (read, write, read, write) to disk_out, the
+    effective values to effective_out and the bottleneck code to codes.
+    """
+    for i in range(sizes.shape[0]):
+        size = sizes[i]
+        spec = disk_specs[disk_ids[i]]
+        limits = machine_limits[machine_ids[i], disk_ids[i]]
+        network = limits[4]
+
+        disk_iops_read = int(min(spec[0] + size * spec[2], spec[4]))
+        disk_iops_write = int(min(spec[1] + size * spec[3], spec[5]))
+        disk_throughput_read = int(min(size * spec[6], spec[8]))
+        disk_throughput_write = int(min(size * spec[7], spec[9]))
+
+        iops_read = min(limits[0], disk_iops_read)
+        iops_write = min(limits[1], disk_iops_write)
+        throughput_read = min(limits[2], disk_throughput_read, network)
+        throughput_write = min(limits[3], disk_throughput_write, network)
+
+        # Throughput below the machine limit is blamed on the disk unless the network is lower
+        code = 0
+        if iops_read < limits[0]:
+            code += 1
+        if iops_write < limits[1]:
+            code += 2
+        if throughput_read < limits[2]:
+            code += 4 if disk_throughput_read <= network else 8
+        if throughput_write < limits[3]:
+            code += 12 if disk_throughput_write <= network else 24
+
+        disk_out[i, 0] = disk_iops_read
+        disk_out[i, 1] = disk_iops_write
+        disk_out[i, 2] = disk_throughput_read
+        disk_out[i, 3] = disk_throughput_write
+        effective_out[i, 0] = iops_read
+        effective_out[i, 1] = iops_write
+        effective_out[i, 2] = throughput_read
+        effective_out[i, 3] = throughput_write
+        codes[i] = code
+
+def calculate_effective_performance_batch(machine_ids, disk_ids, sizes):
+    """Vectorized calculate_effective_performance for size-scaled disks.
+
+    Takes equal-length arrays of MACHINE_IDS values, SCALED_DISK_IDS values and
+    disk sizes; returns a dict of per-row result arrays.
+    """
+    sizes = np.asarray(sizes, dtype=np.float64)
+    n = sizes.shape[0]
+    disk_out = np.empty((n, 4), dtype=np.int64)
+    effective_out = np.empty((n, 4), dtype=np.float64)
+    codes = np.empty(n, dtype=np.int64)
+
+    effective_perf_kernel(
+        sizes,
+        np.asarray(machine_ids, dtype=np.int64),
+        np.asarray(disk_ids, dtype=np.int64),
+        DISK_SPEC_TABLE,
+        MACHINE_LIMITS_TABLE,
+        disk_out,
+        effective_out,
+        codes
+    )
 
-@app.route('/api/analyze', methods=['POST'])
-def analyze_bottleneck():
-    """Use Gemini to analyze bottleneck and provide recommendations"""
-    if not model:
-        return jsonify({'error': 'Gemini API not configured'}), 503
+    return {
+        'disk_iops_read': disk_out[:, 0],
+        'disk_iops_write': disk_out[:, 1],
+        'disk_throughput_read_mbps': disk_out[:, 2],
+        'disk_throughput_write_mbps': disk_out[:, 3],
+        'iops_read': effective_out[:, 0].astype(np.int64),
+        'iops_write': effective_out[:, 1].astype(np.int64),
+        'throughput_read_mbps': effective_out[:, 2].astype(THROUGHPUT_DTYPE),
+        'throughput_write_mbps': effective_out[:, 3].astype(THROUGHPUT_DTYPE),
+        'bottleneck': BOTTLENECK_LABEL_ARRAY[codes]
+    }
+
+# Compile the Numba kernels now (in the gunicorn master when preloading) so the
+# first batch request doesn't pay for JIT compilation. The Docker image build
+# runs this once, so containers load the kernels from the cache instead.
+if SCALED_DISK_IDS and MACHINE_IDS:
+    disk_perf_batch(np.ones(1), DISK_SPEC_TABLE[0])
+    calculate_effective_performance_batch(np.zeros(1), np.zeros(1), np.ones(1))
+
+# Request models, decoded and validated from the raw body by pydantic-core
+# before any business logic runs
+def truncate_size(value):
+    """Accept fractional sizes by truncating them, as int() does"""
+    if isinstance(value, float) and math.isfinite(value):
+        return int(value)
+    return value
+
+def machine_type_text(value):
+    """Look up any non-empty machine_type by its text, so e.g. 5 is an unknown machine"""
+    if value and not isinstance(value, str):
+        return str(value)
+    return value
+
+DiskType = Literal[tuple(disk_data)]
+DiskSize = Annotated[int, BeforeValidator(truncate_size), Field(gt=0)]
+MachineType = Annotated[str, BeforeValidator(machine_type_text), Field(min_length=1)]
+
+class DiskConfig(BaseModel):
+    # Field order decides which problem is reported first: size, then type
+    disk_size_gb: DiskSize
+    disk_type: DiskType
+
+class CalculateRequest(BaseModel):
+    machine_type: MachineType
+    disks: list[DiskConfig] = Field(min_length=1)
+
+class OptimalDiskSizeRequest(BaseModel):
+    machine_type: MachineType
+    disk_type: DiskType
+
+class SweepRequest(BaseModel):
+    disk_type: DiskType
+    sizes: list[DiskSize] = Field(min_length=1)
+
+class BatchRequest(BaseModel):
+    machine_types: list[str] = Field(min_length=1)
+    disk_types: list[DiskType] = Field(min_length=1)
+    sizes: list[DiskSize] = Field(min_length=1)
+
+class AnalyzeRequest(BaseModel):
+    machine_type: Optional[str] = None
+    disk_type: Optional[str] = None
+    disk_size_gb: Optional[int] = None
+    bottleneck: Optional[str] = None
+    effective_performance: Optional[dict] = None
+    machine_limits: Optional[dict] = None
+
+def first_error(exc):
+    """Return (loc, type, input) of the first validation error"""
+    error = exc.errors()[0]
+    return error['loc'], error['type'], error.get('input')
+
+def size_validation_error(label, kind):
+    """Message for a size that failed validation, e.g. label='Disk 2'"""
+    if kind == 'greater_than':
+        return f'{label}: Size must be greater than 0', 400
+    return f'{label}: Size must be a valid number', 400
+
+def disk_size_error(disk_spec, label, size):
+    """Message for a size outside the disk type's limits, or None if it fits"""
+    min_size = disk_spec.get('min_size_gb', 10)
+    max_size = disk_spec.get('max_size_gb', 65536)
+    if size < min_size:
+        return f'{label}: Size too small for {disk_spec["name"]}. Minimum: {min_size} GB'
+    if size > max_size:
+        return f'{label}: Size too large for {disk_spec["name"]}. Maximum: {max_size:,} GB'
+    return None
+
+def calculate_error(exc):
+    """Map a CalculateRequest validation error to (message, status)"""
+    loc, kind, value = first_error(exc)
+    if not loc:
+        return 'Request body must be a JSON object', 400
+    if loc[0] == 'machine_type':
+        return 'Missing machine_type', 400
+    if len(loc) < 3:
+        return 'At least one disk is required', 400
+
+    # An empty field on a disk is reported ahead of any other problem with it
+    disk = f'Disk {loc[1] + 1}'
+    disk_errors = [error for error in exc.errors() if error['loc'][:2] == loc[:2]]
+    if any(error['type'] == 'missing' or not error['input'] for error in disk_errors):
+        return f'{disk}: Missing disk_type or disk_size_gb', 400
+    if loc[2] == 'disk_type':
+        return f'{disk}: Unknown disk type: {value}', 404
+    return size_validation_error(disk, kind)
+
+def optimal_disk_size_error(exc):
+    """Map an OptimalDiskSizeRequest validation error to (message, status)"""
+    loc, kind, value = first_error(exc)
+    if not loc:
+        return 'Request body must be a JSON object', 400
+    if kind == 'missing' or not value:
+        return 'Missing machine_type or disk_type', 400
+    return 'Disk type not found', 404
+
+def sweep_error(exc):
+    """Map a SweepRequest validation error to (message, status)"""
+    loc, kind, value = first_error(exc)
+    if not loc:
+        return 'Request body must be a JSON object', 400
+    if loc[0] == 'disk_type':
+        if kind == 'missing' or value in (None, ''):
+            return 'Missing disk_type', 400
+        return f'Unknown disk type: {value}', 404
+    if len(loc) < 2:
+        return 'At least one size is required', 400
+    return size_validation_error(f'Size {loc[1] + 1}', kind)
+
+def batch_error(exc):
+    """Map a BatchRequest validation error to (message, status)"""
+    loc, kind, value = first_error(exc)
+    if not loc:
+        return 'Request body must be a JSON object', 400
+    field = loc[0]
+    if kind == 'missing':
+        return f'Missing {field}', 400
+    if len(loc) < 2:
+        return f'{field} must be a non-empty list', 400
+    if field == 'disk_types':
+        return f'Unknown disk type: {value}', 404
+    if field == 'machine_types':
+        return f'Invalid machine type: {value}', 400
+    return size_validation_error(f'Size {loc[1] + 1}', kind)
+
+# API Routes
+@app.route('/')
+def index():
+    """Serve the pre-rendered main page"""
+    response = Response(INDEX_HTML, mimetype='text/html')
+    response.set_etag(INDEX_ETAG)
+    response.headers['Cache-Control'] = INDEX_CACHE_CONTROL
+    return response.make_conditional(request)
+
+@app.route('/api/all-machines')
+def get_all_machines():
+    """Get all machine types in a flat list"""
+    return static_json_response(ALL_MACHINES_JSON, ALL_MACHINES_ETAG)
+
+@app.route('/api/disk-types')
+def get_disk_types():
+    """Get all disk types with size constraints"""
+    return static_json_response(DISK_TYPES_JSON, DISK_TYPES_ETAG)
+
+@app.route('/api/optimal-disk-size', methods=['POST'])
+def get_optimal_disk_size():
+    """Calculate optimal disk size to match machine IOPS limits"""
+    try:
+        req = OptimalDiskSizeRequest.model_validate_json(request.get_data())
+    except ValidationError as e:
+        message, status = optimal_disk_size_error(e)
+        return fast_jsonify({'error': message}), status
+
+    machine_type = req.machine_type
+    disk_type = req.disk_type
+
+    if machine_type not in MACHINE_INDEX:
+        return fast_jsonify({'error': 'Machine type not found'}), 404
 
-    data = request.get_json()
+    return Response(OPTIMAL_DISK_SIZE_JSON[(machine_type, disk_type)], mimetype='application/json')
 
-    machine_type = data.get('machine_type')
-    disk_type = data.get('disk_type')
-    disk_size_gb = data.get('disk_size_gb')
-    bottleneck = data.get('bottleneck')
-    effective_performance = data.get('effective_performance')
-    machine_limits = data.get('machine_limits')
+@app.route('/api/calculate', methods=['POST'])
+def calculate():
+    """Calculate performance based on machine type and multiple disks"""
+    try:
+        req = CalculateRequest.model_validate_json(request.get_data())
+    except ValidationError as e:
+        message, status = calculate_error(e)
+        return fast_jsonify({'error': message}), status
+
+    machine_type = req.machine_type
+    disks = req.disks
+
+    # Validate disk sizes against type-specific constraints
+    for idx, disk in enumerate(disks):
+        error = disk_size_error(disk_data[disk.disk_type], f'Disk {idx + 1}', disk.disk_size_gb)
+        if error:
+            return fast_jsonify({'error': error}), 400
+
+    body = calculate_configuration_json(
+        machine_type,
+        tuple((disk.disk_type, disk.disk_size_gb) for disk in disks)
+    )
+    if body is None:
+        return fast_jsonify({'error': f'Unknown machine type: {machine_type}'}), 404
+
+    return Response(body, mimetype='application/json')
+
+@app.route('/api/calculate-sweep', methods=['POST'])
+def calculate_sweep():
+    """Calculate disk performance for one disk type across many sizes"""
+    try:
+        req = SweepRequest.model_validate_json(request.get_data())
+    except ValidationError as e:
+        message, status = sweep_error(e)
+        return fast_jsonify({'error': message}), status
 
-    prompt = f"""You are a GCP support engineer analyzing a performance bottleneck.
+    disk_type = req.disk_type
+    disk_spec = disk_data[disk_type]
+
+    for idx, disk_size_gb in enumerate(req.sizes):
+        error = disk_size_error(disk_spec, f'Size {idx + 1}', disk_size_gb)
+        if error:
+            return fast_jsonify({'error': error}), 400
+
+    return fast_jsonify({
+        'disk_type': disk_type,
+        'disk_name': disk_spec['name'],
+        'points': calculate_disk_performance_sweep(disk_type, req.sizes)
+    })
+
+# Upper bound on machines x disks x sizes evaluated by one /api/calculate-batch call.
+# The kernel is cheap; the limit keeps building the per-row JSON response small.
+MAX_BATCH_CONFIGURATIONS = 10000
+
+@app.route('/api/calculate-batch', methods=['POST'])
+def calculate_batch():
+    """Calculate effective performance for every machine x disk x size combination"""
+    try:
+        req = BatchRequest.model_validate_json(request.get_data())
+    except ValidationError as e:
+        message, status = batch_error(e)
+        return fast_jsonify({'error': message}), status
+
+    if len(req.machine_types) * len(req.disk_types) * len(req.sizes) > MAX_BATCH_CONFIGURATIONS:
+        return fast_jsonify({
+            'error': f'Too many combinations. Maximum: {MAX_BATCH_CONFIGURATIONS:,}'
+        }), 400
+
+    for machine_type in req.machine_types:
+        if machine_type not in MACHINE_IDS:
+            return fast_jsonify({'error': f'Unknown machine type: {machine_type}'}), 404
+
+    for disk_type in req.disk_types:
+        disk_spec = disk_data[disk_type]
+        if disk_type not in SCALED_DISK_IDS:
+            return fast_jsonify({
+                'error': f'{disk_spec["name"]} performance does not scale with size; use /api/calculate'
+            }), 400
+
+        for idx, disk_size_gb in enumerate(req.sizes):
+            error = disk_size_error(disk_spec, f'Size {idx + 1}', disk_size_gb)
+            if error:
+                return fast_jsonify({'error': error}), 400
+
+    # Cartesian product as flat index arrays, machine-major then disk then size
+    machine_idx, disk_idx, size_idx = (
+        grid.ravel() for grid in np.meshgrid(
+            np.arange(len(req.machine_types)),
+            np.arange(len(req.disk_types)),
+            np.arange(len(req.sizes)),
+            indexing='ij'
+        )
+    )
+    machine_ids = np.array([MACHINE_IDS[mt] for mt in req.machine_types])[machine_idx]
+    disk_ids = np.array([SCALED_DISK_IDS[dt] for dt in req.disk_types])[disk_idx]
+    sizes = np.array(req.sizes, dtype=np.int64)[size_idx]
+
+    batch = calculate_effective_performance_batch(machine_ids, disk_ids, sizes)
+    machine_types = [req.machine_types[m] for m in machine_idx.tolist()]
+    disk_types = [req.disk_types[d] for d in disk_idx.tolist()]
+
+    results = [
+        {
+            'machine_type': machine_type,
+            'disk_type': disk_type,
+            'disk_size_gb': size,
+            'disk_performance': {
+                'iops_read': disk_iops_read,
+                'iops_write': disk_iops_write,
+                'throughput_read_mbps': disk_throughput_read,
+                'throughput_write_mbps': disk_throughput_write
+            },
+            'effective_performance': {
+                'iops_read': iops_read,
+                'iops_write': iops_write,
+                'throughput_read_mbps': throughput_read,
+                'throughput_write_mbps': throughput_write
+            },
+            'bottleneck': bottleneck
+        }
+        for (machine_type, disk_type, size,
+             disk_iops_read, disk_iops_write, disk_throughput_read, disk_throughput_write,
+             iops_read, iops_write, throughput_read, throughput_write, bottleneck)
+        in zip(
+            machine_types, disk_types, sizes.tolist(),
+            batch['disk_iops_read'].tolist(), batch['disk_iops_write'].tolist(),
+            batch['disk_throughput_read_mbps'].tolist(), batch['disk_throughput_write_mbps'].tolist(),
+            batch['iops_read'].tolist(), batch['iops_write'].tolist(),
+            batch['throughput_read_mbps'].tolist(), batch['throughput_write_mbps'].tolist(),
+            batch['bottleneck'].tolist()
+        )
+    ]
+
+    return fast_jsonify(results)
+
+def format_prompt_fields(values):
+    """Render a flat dict as '- key: value' lines for a prompt"""
+    if not values:
+        return 'Not provided'
+    return '\n'.join(f"- {key}: {value}" for key, value in values.items())
+
+# Built once at import; only the customer's values are filled in per request
+ANALYZE_PROMPT_TEMPLATE = """You are a GCP support engineer analyzing a performance bottleneck.
 
 Customer Configuration:
 - Machine Type: {machine_type}
@@ -498,10 +1184,10 @@ Bottleneck Analysis:
 {bottleneck}
 
 Current Effective Performance:
-{json.dumps(effective_performance, indent=2)}
+{effective_performance}
 
 Machine Type Limits:
-{json.dumps(machine_limits, indent=2)}
+{machine_limits}
 
 Provide:
 1. Brief explanation of the bottleneck (1-2 sentences)
@@ -512,14 +1198,55 @@ Provide:
 
 Keep response concise and actionable for a support engineer."""
 
+@app.route('/api/analyze', methods=['POST'])
+def analyze_bottleneck():
+    """Use Gemini to analyze bottleneck and provide recommendations"""
+    if not get_model():
+        return fast_jsonify({'error': 'Gemini API not configured'}), 503
+
     try:
-        response = model.generate_content(prompt)
-        return jsonify({
-            'analysis': response.text
+        req = AnalyzeRequest.model_validate_json(request.get_data())
+    except ValidationError as e:
+        return fast_jsonify({'error': f'Invalid analysis request: {e.errors()[0]["msg"]}'}), 400
+
+    prompt = ANALYZE_PROMPT_TEMPLATE.format(
+        machine_type=req.machine_type,
+        disk_type=req.disk_type,
+        disk_size_gb=req.disk_size_gb,
+        bottleneck=req.bottleneck,
+        effective_performance=format_prompt_fields(req.effective_performance),
+        machine_limits=format_prompt_fields(req.machine_limits)
+    )
+
+    # Stream to clients that ask for it, otherwise answer with one JSON body
+    wants_stream = request.accept_mimetypes.best_match(
+        ['application/json', 'text/event-stream']
+    ) == 'text/event-stream'
+    if wants_stream:
+        return Response(
+            stream_generate(prompt),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    try:
+        analysis = cached_generate(prompt)
+        return fast_jsonify({
+            'analysis': analysis
         })
     except Exception as e:
-        return jsonify({'error': f'Failed to generate analysis: {str(e)}'}), 500
+        if gemini_timed_out(e):
+            return fast_jsonify({'error': 'Gemini analysis timed out'}), 504
+        return fast_jsonify({'error': f'Failed to generate analysis: {str(e)}'}), 500
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8080))
-    app.run(host='0.0.0.0', port=port, debug=True)
+    # Local development only; production runs under gunicorn (see gunicorn_conf.py)
+    # The reloader would import the module (and build every table) twice
+    app.run(
+        host='0.0.0.0',
+        port=port,
+        debug=os.environ.get('FLASK_DEBUG') == '1',
+        use_reloader=False,
+        threaded=True
+    )
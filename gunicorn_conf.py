@@ -0,0 +1,27 @@
+import gc
+import multiprocessing
+import os
+
+# Gunicorn settings (used by the Dockerfile and app.yaml)
+bind = f":{os.environ.get('PORT', '8080')}"
+
+# The app is WSGI, so use threaded workers: a slow Gemini call holds one
+# thread while the other threads keep serving /api/calculate and friends
+workers = int(os.environ.get('WEB_CONCURRENCY', 2 * multiprocessing.cpu_count() + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+
+# Import app.py once in the master: the JSON data, lookup indexes and
+# precomputed response bytes are built a single time and shared with the
+# forked workers copy-on-write instead of being rebuilt in every worker
+preload_app = True
+
+def when_ready(server):
+    # Move everything loaded by the master into the permanent generation so
+    # the workers' garbage collector never writes to those pages, which
+    # would otherwise copy the shared data into every worker
+    gc.freeze()
+
+# Long enough for a Gemini call (capped at 30s in app.py) plus streaming
+timeout = 60
+keepalive = 5
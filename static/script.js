@@ -525,7 +525,8 @@ async function getAIAnalysis() {
         const response = await fetch('/api/analyze', {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream'
             },
             body: JSON.stringify({
                 machine_type: currentCalculation.machine_type,
@@ -542,8 +543,30 @@ async function getAIAnalysis() {
             throw new Error(error.error || 'AI analysis failed');
         }
 
-        const result = await response.json();
-        displayAIAnalysis(result.analysis);
+        // Render the analysis as Server-Sent Events arrive
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let analysis = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+
+            for (const event of events) {
+                if (!event.startsWith('data: ')) continue;
+                const payload = JSON.parse(event.slice(6));
+                if (payload.error) throw new Error(payload.error);
+
+                const first = analysis === '';
+                analysis += payload.delta;
+                displayAIAnalysis(analysis, first);
+            }
+        }
     } catch (error) {
         showError('AI analysis failed: ' + error.message);
         console.error(error);
@@ -554,14 +577,16 @@ async function getAIAnalysis() {
 }
 
 // Display AI analysis
-function displayAIAnalysis(analysis) {
+function displayAIAnalysis(analysis, scroll = true) {
     const aiAnalysis = document.getElementById('aiAnalysis');
     const analysisText = document.getElementById('analysisText');
 
     analysisText.innerHTML = analysis.replace(/\n/g, '<br>');
     aiAnalysis.style.display = 'block';
 
-    aiAnalysis.scrollIntoView({ behavior: 'smooth' });
+    if (scroll) {
+        aiAnalysis.scrollIntoView({ behavior: 'smooth' });
+    }
 }
 
 // Utility functions